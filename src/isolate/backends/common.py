@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import hashlib
 import os
+import selectors
 import shutil
+import sys
 import threading
 from contextlib import contextmanager
 from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Iterator, Optional, Tuple
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
 
 _OLD_DIR_PREFIX = "old-"
 
@@ -44,8 +46,21 @@ def get_executable_path(search_path: Path, executable_name: str) -> Path:
     """Return the path for the executable named 'executable_name' under
     the '/bin' directory of 'search_path'."""
 
-    bin_dir = (search_path / "bin").as_posix()
-    executable_path = shutil.which(executable_name, path=bin_dir)
+    bin_dir = search_path / "bin"
+    executable_path: Optional[Union[str, Path]]
+    if os.name == "nt":
+        # Windows executables might have any of the PATHEXT extensions, so
+        # let shutil.which() figure out the actual name.
+        executable_path = shutil.which(executable_name, path=bin_dir.as_posix())
+    else:
+        # On POSIX the layout is fixed, so checking that single file is
+        # enough (and much cheaper than shutil.which()).
+        executable_path = bin_dir / executable_name
+        if not (
+            os.path.isfile(executable_path) and os.access(executable_path, os.X_OK)
+        ):
+            executable_path = None
+
     if executable_path is None:
         raise FileNotFoundError(
             f"Could not find '{executable_name}' in '{search_path}'. "
@@ -55,38 +70,104 @@ def get_executable_path(search_path: Path, executable_name: str) -> Path:
     return Path(executable_path)
 
 
-_MESSAGE_STREAM_DELAY = 0.1
+# The maximum amount of bytes to read from a pipe with a single syscall.
+_READ_CHUNK_SIZE = 1 << 20
+
+# The amount of seconds to wait for the log observers to flush everything
+# once the termination is requested.
+_OBSERVER_TERMINATION_TIMEOUT = 5
+
+
+def _drain_into(reading_fd: int, buffer: bytearray) -> bool:
+    """Read everything that is currently available in the given non-blocking
+    'reading_fd' into the 'buffer'. Returns False if the EOF is reached."""
+
+    while True:
+        try:
+            chunk = os.read(reading_fd, _READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return True
+
+        if not chunk:
+            return False
+        buffer.extend(chunk)
 
 
-def _observe_reader(
-    reading_fd: int,
-    termination_event: threading.Event,
+def _dispatch_lines(
+    buffer: bytearray,
     hook: Callable[[str], None],
+    *,
+    flush: bool = False,
+) -> None:
+    """Call the 'hook' for each complete line in the 'buffer' and leave
+    only the trailing partial line in it. If 'flush' is set, then the partial
+    line is also dispatched."""
+
+    if flush:
+        boundary = len(buffer)
+    else:
+        boundary = buffer.rfind(b"\n") + 1
+
+    if boundary == 0:
+        return None
+
+    # Decode the whole burst at once (straight from the buffer, without
+    # copying it into an intermediate bytes object) and let splitlines()
+    # handle the line boundaries and the newline characters themselves.
+    # The views must be released before the buffer can be resized.
+    with memoryview(buffer) as view, view[:boundary] as burst:
+        text = str(burst, "utf-8", errors="replace")
+    del buffer[:boundary]
+
+    for line in text.splitlines():
+        hook(line)
+
+
+def _observe_readers(
+    hooks: Dict[int, Callable[[str], None]],
+    termination_fd: int,
 ) -> threading.Thread:
-    """Starts a new thread that reads from the specified file descriptor
-    ('reading_fd') and calls the 'hook' for each line until the EOF is
-    reached.
+    """Starts a new thread that reads from all the specified file descriptors
+    (the keys of 'hooks') and calls the corresponding hook for each line until
+    either all of them reach the EOF or the 'termination_fd' becomes readable.
 
-    Caller is responsible for joining the thread.
+    The thread owns all the reading fds (including the 'termination_fd') and
+    closes them once it is done. Caller is responsible for joining the thread.
     """
 
-    assert not os.get_blocking(reading_fd), "reading_fd must be non-blocking"
+    for reading_fd in hooks:
+        assert not os.get_blocking(reading_fd), "reading_fd must be non-blocking"
 
     def _reader():
-        with open(reading_fd) as stream:
-            while not termination_event.wait(_MESSAGE_STREAM_DELAY):
-                line = stream.readline()
-                if not line:
-                    continue
+        buffers = {reading_fd: bytearray() for reading_fd in hooks}
+        try:
+            with selectors.DefaultSelector() as selector:
+                for reading_fd in hooks:
+                    selector.register(reading_fd, selectors.EVENT_READ)
+                selector.register(termination_fd, selectors.EVENT_READ)
 
-                # TODO: probably only strip the last newline, or
-                # do not strip anything at all.
-                hook(line.rstrip())
+                is_terminated = False
+                while not is_terminated:
+                    for key, _ in selector.select():
+                        if key.fd == termination_fd:
+                            is_terminated = True
+                            continue
+
+                        if not _drain_into(key.fd, buffers[key.fd]):
+                            selector.unregister(key.fd)
+                            # Only the termination_fd is left.
+                            is_terminated = len(selector.get_map()) == 1
+
+                        _dispatch_lines(buffers[key.fd], hooks[key.fd])
 
             # Once the termination is requested, read everything
-            # that is left in the stream.
-            for line in stream.readlines():
-                hook(line.rstrip())
+            # that is left in the streams.
+            for reading_fd, hook in hooks.items():
+                _drain_into(reading_fd, buffers[reading_fd])
+                _dispatch_lines(buffers[reading_fd], hook, flush=True)
+        finally:
+            for reading_fd in (*hooks, termination_fd):
+                os.close(reading_fd)
 
     observer_thread = threading.Thread(target=_reader)
     observer_thread.start()
@@ -94,16 +175,43 @@ def _observe_reader(
 
 
 def _unblocked_pipe() -> Tuple[int, int]:
-    """Create a pair of unblocked pipes. This is actually
-    the same as os.pipe2(os.O_NONBLOCK), but that is not
-    available in MacOS so we have to do it manually."""
+    """Create a pair of unblocked (and non-inheritable) pipes. Uses a
+    single os.pipe2() call when it is available, but that is not the
+    case on MacOS so we have to do it manually there."""
 
+    if hasattr(os, "pipe2"):
+        return os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+
+    # os.pipe() already creates non-inheritable file descriptors.
     read_fd, write_fd = os.pipe()
     os.set_blocking(read_fd, False)
     os.set_blocking(write_fd, False)
     return read_fd, write_fd
 
 
+# The default pipe buffer on Linux is 64 KiB, which is easy to fill for chatty
+# processes (e.g. pip install) before the log observer gets the chance to
+# drain it.
+_LOG_PIPE_BUFFER_SIZE = 1 << 20
+_F_SETPIPE_SZ = 1031
+
+
+def _grow_pipe_buffer(fd: int) -> None:
+    """Try to grow the kernel buffer of the given pipe (only on Linux)."""
+
+    if sys.platform != "linux":
+        return None
+
+    import fcntl
+
+    try:
+        fcntl.fcntl(fd, _F_SETPIPE_SZ, _LOG_PIPE_BUFFER_SIZE)
+    except OSError:
+        # Unprivileged processes can't go over /proc/sys/fs/pipe-max-size,
+        # in which case the default size will be used.
+        pass
+
+
 @contextmanager
 def logged_io(
     stdout_hook: Callable[[str], None],
@@ -112,36 +220,48 @@ def logged_io(
     """Open two new streams (for stdout and stderr, respectively) and start relaying all
     the output from them to the given hooks."""
 
-    termination_event = threading.Event()
+    # The observer sleeps on the pipes until there is something to read,
+    # and a write to this pipe wakes it up for the termination.
+    termination_reader_fd, termination_writer_fd = _unblocked_pipe()
 
     stdout_reader_fd, stdout_writer_fd = _unblocked_pipe()
     stderr_reader_fd, stderr_writer_fd = _unblocked_pipe()
-
-    stdout_observer = _observe_reader(
-        stdout_reader_fd,
-        termination_event,
-        hook=stdout_hook,
-    )
-    stderr_observer = _observe_reader(
-        stderr_reader_fd,
-        termination_event,
-        hook=stderr_hook or stdout_hook,
+    for reader_fd in (stdout_reader_fd, stderr_reader_fd):
+        _grow_pipe_buffer(reader_fd)
+
+    observer = _observe_readers(
+        {
+            stdout_reader_fd: stdout_hook,
+            stderr_reader_fd: stderr_hook or stdout_hook,
+        },
+        termination_reader_fd,
     )
     try:
         yield stdout_writer_fd, stderr_writer_fd
     finally:
-        termination_event.set()
         try:
-            stdout_observer.join(timeout=_MESSAGE_STREAM_DELAY)
-            stderr_observer.join(timeout=_MESSAGE_STREAM_DELAY)
-        except TimeoutError:
-            raise RuntimeError("Log observers did not terminate in time.")
+            os.write(termination_writer_fd, b"\0")
+            # If the observer is still busy relaying a large backlog after
+            # the timeout, let it finish on its own (it closes the reading
+            # ends) instead of failing a call that has already completed.
+            observer.join(timeout=_OBSERVER_TERMINATION_TIMEOUT)
+        finally:
+            for fd in (stdout_writer_fd, stderr_writer_fd, termination_writer_fd):
+                os.close(fd)
 
 
 @lru_cache(maxsize=None)
-def sha256_digest_of(*unique_fields: str, _join_char: str = "\n") -> str:
-    """Return the SHA256 digest that corresponds to the combined version
-    of 'unique_fields. The order is preserved."""
-
-    inner_text = _join_char.join(unique_fields).encode()
-    return hashlib.sha256(inner_text).hexdigest()
+def digest_of(*unique_fields: str) -> str:
+    """Return the BLAKE2 digest that corresponds to the combined version
+    of 'unique_fields'. The order is preserved.
+
+    Each field is prefixed with its length, so no two different sequences
+    of fields (e.g. ["ab", "c"] and ["a", "bc"]) can produce the same input
+    for the hash function."""
+
+    digest = hashlib.blake2b(digest_size=32)
+    for field in unique_fields:
+        raw_field = field.encode()
+        digest.update(len(raw_field).to_bytes(8, "little"))
+        digest.update(raw_field)
+    return digest.hexdigest()
@@ -4,12 +4,14 @@ import functools
 import os
 import shutil
 import subprocess
+import threading
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, ClassVar, Dict, List
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Union
 
 from isolate.backends import BaseEnvironment, EnvironmentCreationError
-from isolate.backends.common import logged_io, sha256_digest_of
+from isolate.backends.common import digest_of, logged_io
 from isolate.backends.settings import DEFAULT_SETTINGS, IsolateSettings
 from isolate.connections import PythonIPC
 
@@ -24,6 +26,16 @@ class CondaEnvironment(BaseEnvironment[Path]):
     BACKEND_NAME: ClassVar[str] = "conda"
 
     packages: List[str] = field(default_factory=list)
+    lockfile: Optional[os.PathLike] = None
+
+    def __post_init__(self) -> None:
+        # An explicit lockfile fully determines the environment ('conda create'
+        # ignores any other package spec when it is given one), so mixing the
+        # two would silently drop the packages.
+        if self.lockfile is not None and self.packages:
+            raise ValueError(
+                "Conda environments can't have both 'packages' and a 'lockfile'."
+            )
 
     @classmethod
     def from_config(
@@ -37,43 +49,146 @@ class CondaEnvironment(BaseEnvironment[Path]):
 
     @property
     def key(self) -> str:
-        return sha256_digest_of(*self.packages)
+        if self.lockfile is not None:
+            with open(self.lockfile) as stream:
+                return digest_of(stream.read())
+
+        # The order of the packages is irrelevant for conda, so sort them to
+        # let the same set of packages share the same environment.
+        return digest_of(*sorted(self.packages))
+
+    def _get_create_cmd(self, build_path: Path) -> List[Union[str, os.PathLike]]:
+        """Return the 'conda create' command for building this environment
+        at the given 'build_path'."""
+
+        self.log(f"Creating the environment at '{build_path}'")
+        conda_executable = _get_conda_executable()
+        if self.packages:
+            self.log(f"Installing packages: {', '.join(self.packages)}")
+
+        extra_args: List[Union[str, os.PathLike]] = []
+        if self.lockfile is not None:
+            self.log(f"Using the lockfile: {self.lockfile}")
+            extra_args.extend(["--file", self.lockfile])
+
+        return [
+            conda_executable,
+            "create",
+            "--yes",
+            # The environment will be created under $BASE_CACHE_DIR/conda
+            # so that in the future we can reuse it.
+            "--prefix",
+            build_path,
+            *self.packages,
+            *extra_args,
+        ]
 
     def create(self) -> Path:
         env_path = self.settings.cache_dir_for(self)
         if env_path.exists():
             return env_path
 
-        with self.settings.build_ctx_for(env_path) as build_path:
-            self.log(f"Creating the environment at '{build_path}'")
-            conda_executable = _get_conda_executable()
-            if self.packages:
-                self.log(f"Installing packages: {', '.join(self.packages)}")
+        with _exclusive_build(env_path):
+            # Some other thread (or process) might have already built the same
+            # environment while we were waiting for the lock.
+            if env_path.exists():
+                return env_path
+
+            with self.settings.build_ctx_for(env_path) as build_path:
+                with logged_io(self.log) as (stdout, stderr):
+                    try:
+                        subprocess.check_call(
+                            self._get_create_cmd(build_path),
+                            stdout=stdout,
+                            stderr=stderr,
+                        )
+                    except subprocess.SubprocessError as exc:
+                        raise EnvironmentCreationError(
+                            "Failure during 'conda create'"
+                        ) from exc
+
+            assert env_path.exists(), "Environment must be built at this point"
+            self.log(f"New environment cached at '{env_path}'")
+        return env_path
+
+    @classmethod
+    def create_many(cls, environments: List[CondaEnvironment]) -> List[Path]:
+        """Create all the given environments (the same way as create() does), but
+        run the 'conda create' processes for the ones that are not cached yet
+        in parallel. Returns the environment paths in the same order.
+
+        If any of the builds fail, an EnvironmentCreationError is raised once
+        every process is finished. Only the failed builds are discarded, the
+        successful ones stay cached."""
+
+        env_paths = [
+            environment.settings.cache_dir_for(environment)
+            for environment in environments
+        ]
+
+        failed_builds = []
+        with ExitStack() as stack:
+            builds = []
+            pending_paths = set()
+            # Always acquire the build locks in the same order, so that concurrent
+            # calls with overlapping environments can't deadlock each other.
+            for env_path, environment in sorted(
+                zip(env_paths, environments), key=lambda pair: pair[0]
+            ):
+                if env_path.exists() or env_path in pending_paths:
+                    continue
+
+                stack.enter_context(_exclusive_build(env_path))
+                if env_path.exists():
+                    continue
 
-            with logged_io(self.log) as (stdout, stderr):
+                pending_paths.add(env_path)
+                # Each build gets its own stack, so that it can be committed
+                # (or discarded) independently from the rest of the batch.
+                build_stack = stack.enter_context(ExitStack())
+                build_path = build_stack.enter_context(
+                    environment.settings.build_ctx_for(env_path)
+                )
+                stdout, stderr = build_stack.enter_context(logged_io(environment.log))
+                # Never leave the build context (or the log observer) while
+                # the process is still running, even if something fails.
+                process = build_stack.enter_context(
+                    _reaped(
+                        subprocess.Popen(
+                            environment._get_create_cmd(build_path),
+                            stdout=stdout,
+                            stderr=stderr,
+                        )
+                    )
+                )
+                builds.append((env_path, environment, process, build_stack))
+
+            for env_path, environment, process, build_stack in builds:
                 try:
-                    subprocess.check_call(
-                        [
-                            conda_executable,
-                            "create",
-                            "--yes",
-                            # The environment will be created under $BASE_CACHE_DIR/conda
-                            # so that in the future we can reuse it.
-                            "--prefix",
-                            build_path,
-                            *self.packages,
-                        ],
-                        stdout=stdout,
-                        stderr=stderr,
+                    # Failing inside the build's own stack discards just that
+                    # build directory (a successful one is moved into place).
+                    with build_stack:
+                        if process.wait() != 0:
+                            raise EnvironmentCreationError(
+                                "Failure during 'conda create'"
+                            )
+                except EnvironmentCreationError:
+                    # Lockfile based environments don't have any packages, so
+                    # point to the lockfile to tell which build failed.
+                    failed_builds.append(
+                        repr(str(environment.lockfile))
+                        if environment.lockfile is not None
+                        else repr(environment.packages)
                     )
-                except subprocess.SubprocessError as exc:
-                    raise EnvironmentCreationError(
-                        "Failure during 'conda create'"
-                    ) from exc
+                else:
+                    assert env_path.exists(), "Environment must be built at this point"
+                    environment.log(f"New environment cached at '{env_path}'")
 
-        assert env_path.exists(), "Environment must be built at this point"
-        self.log(f"New environment cached at '{env_path}'")
-        return env_path
+        if failed_builds:
+            raise EnvironmentCreationError(
+                "Failure during 'conda create' for: " + ", ".join(failed_builds)
+            )
+        return env_paths
 
     def destroy(self, connection_key: Path) -> None:
         shutil.rmtree(connection_key)
@@ -86,6 +201,55 @@ class CondaEnvironment(BaseEnvironment[Path]):
         return PythonIPC(self, connection_key)
 
 
+# Name of the directory (under the conda cache) that holds the lock files
+# for the builds, so they don't pile up next to the environments themselves.
+_BUILD_LOCKS_DIR = ".locks"
+
+# Per-environment locks for preventing multiple threads from building the
+# same environment at the same time.
+_BUILD_LOCKS: Dict[str, threading.Lock] = {}
+_BUILD_LOCKS_LOCK = threading.Lock()
+
+
+@contextmanager
+def _exclusive_build(env_path: Path) -> Iterator[None]:
+    """Serialize the builds of the environment at 'env_path', both across the
+    threads of this process and across other processes sharing the same cache
+    directory (through an advisory lock file, where it is supported)."""
+
+    with _BUILD_LOCKS_LOCK:
+        build_lock = _BUILD_LOCKS.setdefault(str(env_path), threading.Lock())
+
+    with build_lock:
+        try:
+            import fcntl
+        except ImportError:
+            # Not available on Windows, so the builds can only be
+            # serialized within the same process.
+            yield
+            return
+
+        lock_dir = env_path.parent / _BUILD_LOCKS_DIR
+        lock_dir.mkdir(exist_ok=True)
+        with open(lock_dir / env_path.name, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+
+@contextmanager
+def _reaped(process: subprocess.Popen) -> Iterator[subprocess.Popen]:
+    """Wait for 'process' to finish on exit. If the block fails, terminate
+    the process first rather than waiting for it to complete."""
+
+    try:
+        yield process
+    except BaseException:
+        process.terminate()
+        raise
+    finally:
+        process.wait()
+
+
 @functools.lru_cache(1)
 def _get_conda_executable() -> Path:
     for path in [_ISOLATE_CONDA_HOME, None]:
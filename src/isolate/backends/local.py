@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import Any, ClassVar, Dict
 
 from isolate.backends import BaseEnvironment
-from isolate.backends.common import sha256_digest_of
+from isolate.backends.common import digest_of
 from isolate.backends.settings import DEFAULT_SETTINGS, IsolateSettings
 from isolate.connections import PythonIPC
 
@@ -27,7 +27,7 @@ class LocalPythonEnvironment(BaseEnvironment[Path]):
 
     @property
     def key(self) -> str:
-        return sha256_digest_of(sys.exec_prefix)
+        return digest_of(sys.exec_prefix)
 
     def create(self) -> Path:
         return Path(sys.exec_prefix)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import json
+import threading
 from dataclasses import dataclass
-from typing import Any, ClassVar, Dict, Optional
+from typing import Any, ClassVar, Dict, Optional, cast
 
 import grpc
 
@@ -12,7 +13,7 @@ from isolate.backends import (
     CallResultType,
     EnvironmentConnection,
 )
-from isolate.backends.common import sha256_digest_of
+from isolate.backends.common import digest_of
 from isolate.backends.settings import DEFAULT_SETTINGS, IsolateSettings
 from isolate.server import interface
 from isolate.server.definitions import (
@@ -21,6 +22,54 @@ from isolate.server.definitions import (
     IsolateStub,
 )
 
+# A marker for the result object, since None is a valid result.
+_UNSET = object()
+
+# Keep the HTTP/2 connection warm with periodic pings, so that long running
+# streams are not silently dropped by load balancers. The interval matches the
+# minimum that stock gRPC servers accept (5 minutes), and there are no pings
+# on idle channels since those get the connection closed with 'too_many_pings'
+# unless the server explicitly permits them.
+_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 300_000),
+    ("grpc.keepalive_timeout_ms", 20_000),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.max_receive_message_length", 64 << 20),
+]
+
+
+@dataclass
+class _SharedChannel:
+    channel: grpc.Channel
+    ref_count: int = 0
+
+
+# All the connections to the same host share a single channel (and thus
+# multiplex over the same HTTP/2 connection) as long as any of them is open.
+_SHARED_CHANNELS: Dict[str, _SharedChannel] = {}
+_SHARED_CHANNELS_LOCK = threading.Lock()
+
+
+def _acquire_shared_channel(host: str) -> grpc.Channel:
+    with _SHARED_CHANNELS_LOCK:
+        shared_channel = _SHARED_CHANNELS.get(host)
+        if shared_channel is None:
+            shared_channel = _SHARED_CHANNELS[host] = _SharedChannel(
+                grpc.insecure_channel(host, options=_CHANNEL_OPTIONS)
+            )
+
+        shared_channel.ref_count += 1
+        return shared_channel.channel
+
+
+def _release_shared_channel(host: str) -> None:
+    with _SHARED_CHANNELS_LOCK:
+        shared_channel = _SHARED_CHANNELS[host]
+        shared_channel.ref_count -= 1
+        if shared_channel.ref_count == 0:
+            del _SHARED_CHANNELS[host]
+            shared_channel.channel.close()
+
 
 @dataclass
 class IsolateServer(BaseEnvironment[EnvironmentDefinition]):
@@ -43,10 +92,16 @@ class IsolateServer(BaseEnvironment[EnvironmentDefinition]):
 
     @property
     def key(self) -> str:
-        return sha256_digest_of(
+        return digest_of(
             self.host,
             self.target_environment_kind,
-            json.dumps(self.target_environment_config),
+            # Semantically identical configurations should map to the same
+            # key, regardless of the insertion order of their keys.
+            json.dumps(
+                self.target_environment_config,
+                sort_keys=True,
+                separators=(",", ":"),
+            ),
         )
 
     def create(self) -> EnvironmentDefinition:
@@ -68,13 +123,18 @@ class IsolateServerConnection(EnvironmentConnection):
     _channel: Optional[grpc.Channel] = None
 
     def _acquire_channel(self) -> None:
-        self._channel = grpc.insecure_channel(self.host)
+        self._channel = _acquire_shared_channel(self.host)
 
     def _release_channel(self) -> None:
         if self._channel:
-            self._channel.close()
+            _release_shared_channel(self.host)
             self._channel = None
 
+    def __enter__(self) -> IsolateServerConnection:
+        if self._channel is None:
+            self._acquire_channel()
+        return self
+
     def __exit__(self, *args: Any) -> None:
         self._release_channel()
 
@@ -84,10 +144,23 @@ class IsolateServerConnection(EnvironmentConnection):
         *args: Any,
         **kwargs: Any,
     ) -> CallResultType:
-        if self._channel is None:
-            self._acquire_channel()
-
-        stub = IsolateStub(self._channel)
+        if self._channel is not None:
+            return cast(CallResultType, self._run(self._channel, executable))
+
+        # The connection is not managed by a 'with' block, so only hold
+        # a reference to the shared channel for the duration of this call.
+        self._acquire_channel()
+        try:
+            return cast(CallResultType, self._run(self._channel, executable))
+        finally:
+            self._release_channel()
+
+    def _run(
+        self,
+        channel: grpc.Channel,
+        executable: BasicCallable,
+    ) -> Any:
+        stub = IsolateStub(channel)
         request = BoundFunction(
             function=interface.to_serialized_object(
                 executable,
@@ -97,24 +170,27 @@ class IsolateServerConnection(EnvironmentConnection):
             environment=self.definition,
         )
 
-        return_value = []
+        # Chatty functions might send thousands of logs, so avoid the
+        # repeated attribute lookups in the dispatch loop.
+        from_grpc, log = interface.from_grpc, self.log
+
+        result_obj = _UNSET
         for result in stub.Run(request):
             for raw_log in result.logs:
-                log = interface.from_grpc(raw_log)
-                self.log(log.message, level=log.level, source=log.source)
+                message = from_grpc(raw_log)
+                log(message.message, level=message.level, source=message.source)
 
             if result.is_complete:
-                return_value.append(interface.from_grpc(result.result))
-
-        if len(return_value) == 0:
+                if result_obj is not _UNSET:
+                    raise RuntimeError(
+                        "Multiple result objects were received from the server"
+                        " (it set is_complete to True multiple times)."
+                    )
+                result_obj = from_grpc(result.result)
+
+        if result_obj is _UNSET:
             raise RuntimeError(
                 "No result object was received from the server"
                 " (it never set is_complete to True)."
             )
-        elif len(return_value) > 1:
-            raise RuntimeError(
-                "Multiple result objects were received from the server"
-                " (it set is_complete to True multiple times)."
-            )
-        else:
-            return return_value[0]
+        return result_obj
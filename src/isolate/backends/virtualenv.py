@@ -8,11 +8,7 @@ from pathlib import Path
 from typing import Any, ClassVar, Dict, List, Optional, Union
 
 from isolate.backends import BaseEnvironment, EnvironmentCreationError
-from isolate.backends.common import (
-    get_executable_path,
-    logged_io,
-    sha256_digest_of,
-)
+from isolate.backends.common import digest_of, get_executable_path, logged_io
 from isolate.backends.settings import DEFAULT_SETTINGS, IsolateSettings
 from isolate.connections import PythonIPC
 
@@ -41,7 +37,7 @@ class VirtualPythonEnvironment(BaseEnvironment[Path]):
                 constraints = stream.read().splitlines()
         else:
             constraints = []
-        return sha256_digest_of(*self.requirements, *constraints)
+        return digest_of(*self.requirements, *constraints)
 
     def install_requirements(self, path: Path) -> None:
         """Install the requirements of this environment using 'pip' to the
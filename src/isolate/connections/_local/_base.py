@@ -5,7 +5,7 @@ import subprocess
 import sysconfig
 from contextlib import contextmanager
 from dataclasses import dataclass, field
-from functools import partial
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import (
     TYPE_CHECKING,
@@ -27,19 +27,33 @@ if TYPE_CHECKING:
 ConnectionType = TypeVar("ConnectionType")
 
 
+# A placeholder for the base directory that sysconfig substitutes
+# when rendering the path templates.
+_BASE_PLACEHOLDER = "__ISOLATE_BASE__"
+
+
+@lru_cache(1)
+def _purelib_template() -> str:
+    """Return the 'purelib' path of the current interpreter's installation
+    scheme, with its base directory left as a placeholder."""
+
+    # sysconfig defines the schema of the directories under
+    # any comforming Python installation (like venv, conda, etc.).
+    #
+    # Be aware that Debian's system installation does not
+    # comform sysconfig.
+    return sysconfig.get_path("purelib", vars={"base": _BASE_PLACEHOLDER})
+
+
 def python_path_for(*search_paths: Path) -> str:
     """Return the PYTHONPATH for the library paths residing
     in the given 'search_paths'. The order of the paths is
     preserved."""
 
     assert len(search_paths) >= 1
+    template = _purelib_template()
     return os.pathsep.join(
-        # sysconfig defines the schema of the directories under
-        # any comforming Python installation (like venv, conda, etc.).
-        #
-        # Be aware that Debian's system installation does not
-        # comform sysconfig.
-        sysconfig.get_path("purelib", vars={"base": search_path})
+        template.replace(_BASE_PLACEHOLDER, str(search_path))
         for search_path in search_paths
     )
 
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import importlib
-from contextlib import contextmanager
-from typing import TYPE_CHECKING, Any, Iterator, cast
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, cast
 
 if TYPE_CHECKING:
     from typing import Protocol
@@ -19,19 +19,6 @@ class SerializationError(Exception):
     """An error that happened during the serialization process."""
 
 
-@contextmanager
-def _step(message: str) -> Iterator[None]:
-    """A context manager to capture every expression
-    underneath it and if any of them fails for any reason
-    then it will raise a SerializationError with the
-    given message."""
-
-    try:
-        yield
-    except BaseException as exception:
-        raise SerializationError("Error while " + message) from exception
-
-
 def as_serialization_method(backend: Any) -> SerializationBackend:
     """Ensures that the given backend has loads/dumps methods, and returns
     it as is (also convinces type checkers that the given object satisfies
@@ -46,6 +33,27 @@ def as_serialization_method(backend: Any) -> SerializationBackend:
     return cast("SerializationBackend", backend)
 
 
+@lru_cache(maxsize=None)
+def _get_serialization_backend(serialization_method: str) -> SerializationBackend:
+    """Import the module for the given serialization method and return it
+    as a serialization backend. The result is cached, since the method is
+    looked up on each serialization call."""
+
+    return as_serialization_method(importlib.import_module(serialization_method))
+
+
+def _prepare_serialization_backend(serialization_method: str) -> SerializationBackend:
+    """Return the serialization backend for the given method, or raise a
+    SerializationError if it can't be loaded."""
+
+    try:
+        return _get_serialization_backend(serialization_method)
+    except BaseException as exception:
+        raise SerializationError(
+            f"Error while preparing the serialization backend ({serialization_method})"
+        ) from exception
+
+
 def load_serialized_object(
     serialization_method: str,
     raw_object: bytes,
@@ -57,13 +65,15 @@ def load_serialized_object(
     flag is set to true, then the given object will be raised as an exception (instead
     of being returned)."""
 
-    with _step(f"preparing the serialization backend ({serialization_method})"):
-        serialization_backend = as_serialization_method(
-            importlib.import_module(serialization_method)
-        )
-
-    with _step("deserializing the given object"):
+    # These two functions are on the hot path of every call, so the
+    # exceptions are remapped inline rather than through a context manager.
+    serialization_backend = _prepare_serialization_backend(serialization_method)
+    try:
         result = serialization_backend.loads(raw_object)
+    except BaseException as exception:
+        raise SerializationError(
+            "Error while deserializing the given object"
+        ) from exception
 
     if was_it_raised:
         raise result
@@ -75,10 +85,10 @@ def serialize_object(serialization_method: str, object: Any) -> bytes:
     """Serialize the given object using the given serialization method. If
     anything fails, then a SerializationError will be raised."""
 
-    with _step(f"preparing the serialization backend ({serialization_method})"):
-        serialization_backend = as_serialization_method(
-            importlib.import_module(serialization_method)
-        )
-
-    with _step("serializing the given object"):
+    serialization_backend = _prepare_serialization_backend(serialization_method)
+    try:
         return serialization_backend.dumps(object)
+    except BaseException as exception:
+        raise SerializationError(
+            "Error while serializing the given object"
+        ) from exception
@@ -32,14 +32,24 @@ def _(message: definitions.SerializedObject) -> Any:
     )
 
 
+@functools.lru_cache(maxsize=None)
+def _log_source_from_grpc(raw_source: definitions.LogSource.ValueType) -> LogSource:
+    return LogSource(definitions.LogSource.Name(raw_source).lower())
+
+
+@functools.lru_cache(maxsize=None)
+def _log_level_from_grpc(raw_level: definitions.LogLevel.ValueType) -> LogLevel:
+    return LogLevel(definitions.LogLevel.Name(raw_level).lower())
+
+
 @from_grpc.register
 def _(message: definitions.Log) -> Log:
-    source = LogSource(definitions.LogSource.Name(message.source).lower())
-    level = LogLevel(definitions.LogLevel.Name(message.level).lower())
+    # Logs are converted one by one on the hot path, so resolve the enum
+    # values through a cache instead of doing the name lookups each time.
     return Log(
         message=message.message,
-        source=source,
-        level=level,
+        source=_log_source_from_grpc(message.source),
+        level=_log_level_from_grpc(message.level),
     )
 
 
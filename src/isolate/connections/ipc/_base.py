@@ -2,21 +2,15 @@ from __future__ import annotations
 
 import base64
 import importlib
+import os
+import pickle
+import socket
 import subprocess
-import time
 from contextlib import ExitStack, closing
 from dataclasses import dataclass
-from multiprocessing.connection import Connection, Listener
+from multiprocessing.connection import Listener
 from pathlib import Path
-from typing import (
-    TYPE_CHECKING,
-    Any,
-    Callable,
-    ContextManager,
-    List,
-    Tuple,
-    Union,
-)
+from typing import Any, ContextManager, List, Tuple, Union
 
 from isolate.backends import (
     BasicCallable,
@@ -27,30 +21,6 @@ from isolate.connections._local import PythonExecutionBase, agent_startup
 from isolate.connections.ipc import agent
 from isolate.logs import LogLevel, LogSource
 
-if TYPE_CHECKING:
-    # Somhow mypy can't figure out that `ConnectionWrapper`
-    # really exists.
-    class ConnectionWrapper(Connection):
-        def __init__(
-            self,
-            connection: Any,
-            loads: Callable[[bytes], Any],
-            dumps: Callable[[Any], bytes],
-        ) -> None:
-            ...
-
-        def recv(self) -> Any:
-            ...
-
-        def send(self, value: Any) -> None:
-            ...
-
-        def close(self) -> None:
-            ...
-
-else:
-    from multiprocessing.connection import ConnectionWrapper
-
 
 class AgentListener(Listener):
     """A custom listener that can use any available serialization method
@@ -60,11 +30,12 @@ class AgentListener(Listener):
         self.serialization_backend = loadserialization_method(backend_name)
         super().__init__(*args, **kwargs)
 
-    def accept(self) -> Connection:
-        return ConnectionWrapper(
-            super().accept(),
-            dumps=self.serialization_backend.dumps,
-            loads=self.serialization_backend.loads,
+    def accept(self) -> agent.SerializingConnection:  # type: ignore[override]
+        connection = super().accept()
+        return agent.SerializingConnection(
+            connection,
+            self.serialization_backend,
+            peer_protocol=agent.receive_protocol(connection),
         )
 
 
@@ -74,9 +45,25 @@ def loadserialization_method(backend_name: str) -> Any:
     return importlib.import_module(backend_name)
 
 
-def encode_service_address(address: Tuple[str, int]) -> str:
-    host, port = address
-    return base64.b64encode(f"{host}:{port}".encode()).decode("utf-8")
+# Unix domain sockets skip the whole TCP stack on the loopback interface, so
+# prefer them whenever they are available.
+_BRIDGE_FAMILY = "AF_UNIX" if hasattr(socket, "AF_UNIX") else "AF_INET"
+
+# Prefix for marking the encoded address as a path to a unix domain socket.
+_UNIX_ADDRESS_PREFIX = b"unix:"
+
+
+def encode_service_address(address: Union[str, Tuple[str, int]]) -> str:
+    if isinstance(address, tuple):
+        host, port = address
+        raw_address = f"{host}:{port}".encode()
+    else:
+        # Socket paths are passed around as raw bytes, so that they can
+        # be decoded back exactly as they were given.
+        raw_address = _UNIX_ADDRESS_PREFIX + os.fsencode(address)
+
+    # URL-safe alphabet doesn't need any quoting on the command line.
+    return base64.urlsafe_b64encode(raw_address).decode("ascii")
 
 
 @dataclass
@@ -87,8 +74,8 @@ class IsolatedProcessConnection(EnvironmentConnection):
     Each implementation needs to define a start_process method to
     spawn the agent."""
 
-    # The amount of seconds to wait before checking whether the
-    # isolated process has exited or not.
+    # The amount of seconds to wait for the result before checking
+    # whether the isolated process has exited or not.
     _DEFER_THRESHOLD = 0.25
 
     def start_process(
@@ -127,7 +114,7 @@ class IsolatedProcessConnection(EnvironmentConnection):
             controller_service = stack.enter_context(
                 AgentListener(
                     self.environment.settings.serialization_method,
-                    family="AF_INET",
+                    family=_BRIDGE_FAMILY,
                 )
             )
 
@@ -162,25 +149,19 @@ class IsolatedProcessConnection(EnvironmentConnection):
     def poll_until_result(
         self,
         process: subprocess.Popen,
-        connection: Connection,
+        connection: agent.SerializingConnection,
     ) -> CallResultType:
         """Take the given process, and poll until either it exits or returns
         a result object."""
 
-        while not connection.poll():
-            # Normally, if we do connection.read() without having this loop
-            # it is going to block us indefinitely (even if the underlying
-            # process has crashed). We can use a combination of process.poll
-            # and connection.poll to check if the process is alive and has data
-            # to move forward.
-            if process.poll():
+        # Normally, if we do connection.recv() without having this loop
+        # it is going to block us indefinitely (even if the underlying
+        # process has crashed). So wait for the data with a timeout, and
+        # in between check whether the process is still alive.
+        while not connection.poll(self._DEFER_THRESHOLD):
+            if process.poll() is not None:
                 break
 
-            # For preventing busy waiting, we can sleep for a bit
-            # and let other threads run.
-            time.sleep(self._DEFER_THRESHOLD)
-            continue
-
         if not connection.poll():
             # If the process has exited but there is still no data, we
             # can assume something terrible has happened.
@@ -206,7 +187,6 @@ class PythonIPC(PythonExecutionBase[AgentListener], IsolatedProcessConnection):
         executable: Path,
         connection: AgentListener,
     ) -> List[Union[str, Path]]:
-        assert isinstance(connection.address, tuple)
         return [
             executable,
             agent_startup.__file__,
@@ -217,6 +197,8 @@ class PythonIPC(PythonExecutionBase[AgentListener], IsolatedProcessConnection):
             # the connection with the bridge.
             "--serialization-backend",
             self.environment.settings.serialization_method,
+            "--pickle-protocol",
+            str(pickle.HIGHEST_PROTOCOL),
         ]
 
     def handle_agent_log(self, line: str, level: LogLevel) -> None:
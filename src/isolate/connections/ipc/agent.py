@@ -2,7 +2,8 @@
 # sockets. It is spawned by the controller process with a single argument (a
 # base64 encoded server address) and expected to go through the following procedures:
 #   1. Decode the given address
-#   2. Create a connection to the transmission bridge using the address
+#   2. Create a connection to the transmission bridge using the address (and
+#      announce the highest pickle protocol this interpreter can load)
 #   3. Receive a callable object from the bridge
 #   4. Execute the callable object
 #   5. Send the result back to the bridge
@@ -16,55 +17,161 @@
 # indicating whether the callable has raised an exception or not.
 
 import base64
+import functools
 import importlib
+import inspect
 import os
+import pickle
+import struct
 import sys
 import time
 from argparse import ArgumentParser
 from contextlib import closing
-from multiprocessing.connection import Client
-from typing import TYPE_CHECKING, Any, Callable, ContextManager, Tuple
+from multiprocessing.connection import Client, Connection
+from typing import Any, ContextManager, Dict, List, Optional, Tuple, Union
 
-if TYPE_CHECKING:
-    # Somhow mypy can't figure out that `ConnectionWrapper`
-    # really exists.
-    class ConnectionWrapper:
-        def __init__(
-            self,
-            connection: Any,
-            loads: Callable[[bytes], Any],
-            dumps: Callable[[Any], bytes],
-        ) -> None:
-            ...
+# Pickle protocol 5 allows large buffers (e.g. numpy arrays) to be transferred
+# out-of-band, without copying them into the serialized payload first.
+_OUT_OF_BAND_PROTOCOL = 5
 
-        def recv(self) -> Any:
-            ...
+# The controller and the agent might be running on different Python versions, so
+# the agent announces the highest pickle protocol it can load (as a single byte)
+# right after connecting, and the controller passes its own on the command line.
+_PROTOCOL_ANNOUNCEMENT_FORMAT = "!B"
 
-        def send(self, value: Any) -> None:
-            ...
 
-        def close(self) -> None:
-            ...
+def announce_protocol(connection: Connection) -> None:
+    connection.send_bytes(
+        struct.pack(_PROTOCOL_ANNOUNCEMENT_FORMAT, pickle.HIGHEST_PROTOCOL)
+    )
+
+
+def receive_protocol(connection: Connection) -> int:
+    (protocol,) = struct.unpack(_PROTOCOL_ANNOUNCEMENT_FORMAT, connection.recv_bytes())
+    return protocol
+
+
+@functools.lru_cache(maxsize=None)
+def _supports_out_of_band(serialization_backend: Any) -> bool:
+    """Check whether the given backend's dumps() can take the 'protocol' and the
+    'buffer_callback' arguments for producing out-of-band buffers."""
+
+    if pickle.HIGHEST_PROTOCOL < _OUT_OF_BAND_PROTOCOL:
+        return False
+
+    try:
+        parameters = inspect.signature(serialization_backend.dumps).parameters
+    except (TypeError, ValueError):
+        return False
+
+    return "protocol" in parameters and (
+        "buffer_callback" in parameters
+        or any(
+            parameter.kind is inspect.Parameter.VAR_KEYWORD
+            for parameter in parameters.values()
+        )
+    )
+
+
+class SerializingConnection:
+    """A wrapper around multiprocessing's Connection objects that sends and
+    receives objects with the given serialization backend.
+
+    If 'peer_protocol' (the highest pickle protocol the other side can load) is
+    known, objects are serialized with the highest protocol both sides support.
+    When that is protocol 5 and the backend supports it (pickle, dill and
+    cloudpickle all do), the out-of-band buffers are sent as separate messages
+    right after the main payload and received directly into writable buffers
+    of the same size. Each object is framed as:
+        1. header (number of out-of-band buffers and their sizes) followed by
+           the serialized payload, in a single message
+        2. out-of-band buffers (if any), one message each
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        serialization_backend: Any,
+        peer_protocol: Optional[int] = None,
+    ) -> None:
+        self._connection = connection
+        self._serialization_backend = serialization_backend
 
-else:
-    from multiprocessing.connection import ConnectionWrapper
+        self._dumps_options: Dict[str, Any] = {}
+        self._use_out_of_band = False
+        if peer_protocol is not None:
+            protocol = min(peer_protocol, pickle.HIGHEST_PROTOCOL)
+            self._dumps_options["protocol"] = protocol
+            self._use_out_of_band = protocol >= _OUT_OF_BAND_PROTOCOL and (
+                _supports_out_of_band(serialization_backend)
+            )
 
+    def send(self, obj: Any) -> None:
+        buffers: List[Any] = []
+        if self._use_out_of_band:
+            payload = self._serialization_backend.dumps(
+                obj, buffer_callback=buffers.append, **self._dumps_options
+            )
+        else:
+            payload = self._serialization_backend.dumps(obj, **self._dumps_options)
 
-def decode_service_address(address: str) -> Tuple[str, int]:
-    host, port = base64.b64decode(address).decode("utf-8").rsplit(":", 1)
+        raw_buffers = [buffer.raw() for buffer in buffers]
+        header = struct.pack(
+            f"!I{len(raw_buffers)}Q",
+            len(raw_buffers),
+            *(raw_buffer.nbytes for raw_buffer in raw_buffers),
+        )
+        self._connection.send_bytes(header + payload)
+        for raw_buffer in raw_buffers:
+            self._connection.send_bytes(raw_buffer)
+
+    def recv(self) -> Any:
+        message = self._connection.recv_bytes()
+        (num_buffers,) = struct.unpack_from("!I", message)
+        buffer_sizes = struct.unpack_from(f"!{num_buffers}Q", message, offset=4)
+        payload = memoryview(message)[struct.calcsize(f"!I{num_buffers}Q") :]
+        if not buffer_sizes:
+            return self._serialization_backend.loads(payload)
+
+        buffers = []
+        for buffer_size in buffer_sizes:
+            buffer = bytearray(buffer_size)
+            self._connection.recv_bytes_into(buffer)
+            buffers.append(buffer)
+        return self._serialization_backend.loads(payload, buffers=buffers)
+
+    def poll(self, timeout: Optional[float] = 0.0) -> bool:
+        return self._connection.poll(timeout)
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+# Must be kept in sync with the controller's encode_service_address.
+_UNIX_ADDRESS_PREFIX = b"unix:"
+
+AddressType = Union[str, Tuple[str, int]]
+
+
+def decode_service_address(address: str) -> AddressType:
+    raw_address = base64.urlsafe_b64decode(address.encode("ascii"))
+    if raw_address.startswith(_UNIX_ADDRESS_PREFIX):
+        return os.fsdecode(raw_address[len(_UNIX_ADDRESS_PREFIX) :])
+
+    host, port = raw_address.decode().rsplit(":", 1)
     return host, int(port)
 
 
 def child_connection(
-    serialization_method: str, address: Tuple[str, int]
-) -> ContextManager[ConnectionWrapper]:
+    serialization_method: str,
+    address: AddressType,
+    peer_protocol: Optional[int] = None,
+) -> ContextManager[SerializingConnection]:
     serialization_backend = importlib.import_module(serialization_method)
+    connection = Client(address)
+    announce_protocol(connection)
     return closing(
-        ConnectionWrapper(
-            Client(address),
-            loads=serialization_backend.loads,
-            dumps=serialization_backend.dumps,
-        )
+        SerializingConnection(connection, serialization_backend, peer_protocol)
     )
 
 
@@ -73,7 +180,11 @@ DEBUG_TIMEOUT = 60 * 15
 
 
 def run_client(
-    serialization_method: str, address: Tuple[str, int], *, with_pdb: bool = False
+    serialization_method: str,
+    address: AddressType,
+    *,
+    peer_protocol: Optional[int] = None,
+    with_pdb: bool = False,
 ) -> None:
     # Debug Mode
     # ==========
@@ -102,7 +213,7 @@ def run_client(
     print(f"[trace] Trying to create a connection to {address}")
     # TODO(feat): this should probably run in a loop instead of
     # receiving a single function and then exitting immediately.
-    with child_connection(serialization_method, address) as connection:
+    with child_connection(serialization_method, address, peer_protocol) as connection:
         print(f"[trace] Created child connection to {address}")
         callable = connection.recv()
         print(f"[trace] Received the callable at {address}")
@@ -157,6 +268,8 @@ def main() -> int:
     parser.add_argument("listen_at")
     parser.add_argument("--with-pdb", action="store_true", default=False)
     parser.add_argument("--serialization-backend", default="pickle")
+    # The highest pickle protocol that the controller can load.
+    parser.add_argument("--pickle-protocol", type=int, default=None)
 
     options = parser.parse_args()
     if IS_DEBUG_MODE:
@@ -168,8 +281,10 @@ def main() -> int:
             f"    $ {_get_shell_bootstrap()}\\\n     "
             f"{sys.executable} {os.path.abspath(__file__)} "
             f"--serialization-backend {options.serialization_backend} "
-            f"--with-pdb {options.listen_at}"
         )
+        if options.pickle_protocol is not None:
+            message += f"--pickle-protocol {options.pickle_protocol} "
+        message += f"--with-pdb {options.listen_at}"
         message += "\n" * 3
         message += "=" * 60
         print(message)
@@ -177,7 +292,12 @@ def main() -> int:
 
     serialization_method = options.serialization_backend
     address = decode_service_address(options.listen_at)
-    run_client(serialization_method, address, with_pdb=options.with_pdb)
+    run_client(
+        serialization_method,
+        address,
+        peer_protocol=options.pickle_protocol,
+        with_pdb=options.with_pdb,
+    )
     return 0
 
 
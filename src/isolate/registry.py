@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any, Dict, Type, Union
 
-import importlib_metadata
-
 if TYPE_CHECKING:
+    import importlib_metadata
+
     from isolate.backends import BaseEnvironment
 
 # Any new environments can register themselves during package installation
@@ -17,20 +18,28 @@ _ENVIRONMENT_REGISTRY: Dict[
 ] = {}
 
 
-def _reload_registry() -> None:
+@lru_cache(1)
+def _scan_entry_points() -> Dict[str, importlib_metadata.EntryPoint]:
+    # Scanning the entry points requires going through the metadata of every
+    # installed distribution, so it is only done once an environment is needed
+    # (instead of at the import time) and the result is cached.
+    import importlib_metadata
+
     entry_points = importlib_metadata.entry_points()
-    _ENVIRONMENT_REGISTRY.update(
-        {
-            # We are not immediately loading the backend class here
-            # since it might cause importing modules that we won't be
-            # using at all.
-            entry_point.name: entry_point
-            for entry_point in entry_points.select(group=_ENTRY_POINT)
-        }
-    )
+    return {
+        # We are not immediately loading the backend class here
+        # since it might cause importing modules that we won't be
+        # using at all.
+        entry_point.name: entry_point
+        for entry_point in entry_points.select(group=_ENTRY_POINT)
+    }
 
 
-_reload_registry()
+def _reload_registry() -> None:
+    """Scan the entry points again (e.g. after installing a new backend in the
+    same process) and register everything that is found."""
+    _scan_entry_points.cache_clear()
+    _ENVIRONMENT_REGISTRY.update(_scan_entry_points())
 
 
 def prepare_environment(
@@ -38,8 +47,15 @@ def prepare_environment(
     **kwargs: Any,
 ) -> BaseEnvironment:
     """Get the environment for the given `kind` with the given `config`."""
+    import importlib_metadata
+
     from isolate.backends.settings import DEFAULT_SETTINGS
 
+    if kind not in _ENVIRONMENT_REGISTRY:
+        entry_point = _scan_entry_points().get(kind)
+        if entry_point is not None:
+            _ENVIRONMENT_REGISTRY[kind] = entry_point
+
     registered_env_cls = _ENVIRONMENT_REGISTRY.get(kind)
     if not registered_env_cls:
         raise ValueError(f"Unknown environment: '{kind}'")
@@ -1,5 +1,6 @@
 import subprocess
 import sys
+import time
 from contextlib import contextmanager
 from functools import partial
 from pathlib import Path
@@ -9,7 +10,7 @@ import pytest
 
 import isolate
 from isolate.backends import BaseEnvironment, EnvironmentCreationError
-from isolate.backends.common import sha256_digest_of
+from isolate.backends.common import digest_of
 from isolate.backends.conda import CondaEnvironment, _get_conda_executable
 from isolate.backends.local import LocalPythonEnvironment
 from isolate.backends.remote import IsolateServer
@@ -154,9 +155,7 @@ class TestVirtualenv(GenericEnvironmentTests):
     creation_entry_point = ("virtualenv.cli_run", PermissionError)
 
     def make_constraints_file(self, tmp_path: Any, constraints: List[str]) -> Any:
-        constraints_file = (
-            tmp_path / f"constraints_{sha256_digest_of(*constraints)}.txt"
-        )
+        constraints_file = tmp_path / f"constraints_{digest_of(*constraints)}.txt"
         constraints_file.write_text("\n".join(constraints))
         return constraints_file
 
@@ -252,6 +251,141 @@ class TestConda(GenericEnvironmentTests):
         )
 
 
+def test_conda_environment_key(tmp_path):
+    environment_1 = CondaEnvironment(packages=["pyjokes=0.5.0", "python"])
+    environment_2 = CondaEnvironment(packages=["python", "pyjokes=0.5.0"])
+    assert environment_1.key == environment_2.key
+
+    lockfile_1 = tmp_path / "lockfile_1.txt"
+    lockfile_1.write_text("@EXPLICIT\n")
+    lockfile_2 = tmp_path / "lockfile_2.txt"
+    lockfile_2.write_text("@EXPLICIT\nhttps://example.com/pyjokes-0.5.0.tar.bz2\n")
+
+    environment_3 = CondaEnvironment(lockfile=lockfile_1)
+    environment_4 = CondaEnvironment(lockfile=lockfile_2)
+    assert environment_1.key != environment_3.key != environment_4.key
+
+    # The key only depends on the contents of the lockfile.
+    lockfile_3 = tmp_path / "lockfile_3.txt"
+    lockfile_3.write_text(lockfile_2.read_text())
+    environment_5 = CondaEnvironment(lockfile=lockfile_3)
+    assert environment_4.key == environment_5.key
+
+
+def test_conda_environment_packages_with_lockfile(tmp_path):
+    lockfile = tmp_path / "lockfile.txt"
+    lockfile.write_text("@EXPLICIT\n")
+
+    with pytest.raises(ValueError):
+        CondaEnvironment(packages=["python"], lockfile=lockfile)
+
+    with pytest.raises(ValueError):
+        CondaEnvironment.from_config(
+            {"packages": ["python"], "lockfile": str(lockfile)}
+        )
+
+
+def test_conda_environment_concurrent_creation(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    build_calls = []
+
+    def fake_check_call(cmd, **kwargs):
+        build_calls.append(cmd)
+        time.sleep(0.1)
+
+    monkeypatch.setattr("isolate.backends.conda._get_conda_executable", lambda: "conda")
+    monkeypatch.setattr("subprocess.check_call", fake_check_call)
+
+    environment = CondaEnvironment(packages=["python"])
+    environment.apply_settings(IsolateSettings(Path(tmp_path)))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        env_paths = list(executor.map(lambda _: environment.create(), range(4)))
+
+    assert len(build_calls) == 1
+    assert len(set(env_paths)) == 1
+
+    # Lock files are kept out of the way of the environments.
+    [env_path] = set(env_paths)
+    assert sorted(path.name for path in env_path.parent.iterdir()) == [
+        ".locks",
+        env_path.name,
+    ]
+
+
+def test_conda_environment_create_many(tmp_path, monkeypatch):
+    # A fake conda executable which only creates the prefix directory (or
+    # fails if it is asked to install anything 'invalid', and hangs on
+    # anything 'slow').
+    fake_conda = tmp_path / "conda"
+    fake_conda.write_text(
+        "#!/bin/sh\n"
+        'case "$*" in *invalid*) exit 1;; *slow*) sleep 60;; esac\n'
+        'echo "creating $4"\n'
+        'mkdir -p "$4"\n'
+    )
+    fake_conda.chmod(0o755)
+    monkeypatch.setattr(
+        "isolate.backends.conda._get_conda_executable", lambda: fake_conda
+    )
+
+    test_settings = IsolateSettings(Path(tmp_path / "cache"))
+    environments = []
+    for packages in [["pyjokes=0.5.0"], ["pyjokes=0.6.0"], ["pyjokes=0.5.0"]]:
+        environment = CondaEnvironment(packages=packages)
+        environment.apply_settings(test_settings)
+        environments.append(environment)
+
+    env_paths = CondaEnvironment.create_many(environments)
+    assert env_paths == [environment.create() for environment in environments]
+    assert env_paths[0] == env_paths[2] != env_paths[1]
+    assert all(env_path.exists() for env_path in env_paths)
+
+    # A failure only discards its own build, the rest of the batch is kept.
+    valid_environment = CondaEnvironment(packages=["pyjokes=0.7.0"])
+    valid_environment.apply_settings(test_settings)
+    invalid_environment = CondaEnvironment(packages=["invalid"])
+    invalid_environment.apply_settings(test_settings)
+    invalid_lockfile = tmp_path / "invalid_lockfile.txt"
+    invalid_lockfile.write_text("@EXPLICIT\n")
+    invalid_lockfile_environment = CondaEnvironment(lockfile=invalid_lockfile)
+    invalid_lockfile_environment.apply_settings(test_settings)
+    with pytest.raises(EnvironmentCreationError) as exc_info:
+        CondaEnvironment.create_many(
+            [valid_environment, invalid_environment, invalid_lockfile_environment]
+        )
+    assert valid_environment.exists()
+    assert not invalid_environment.exists()
+    assert not invalid_lockfile_environment.exists()
+    assert "['invalid']" in str(exc_info.value)
+    assert str(invalid_lockfile) in str(exc_info.value)
+
+    # If something goes wrong while the builds are running, they are terminated
+    # instead of being waited on.
+    slow_environments = []
+    for packages in [["slow", "pyjokes=0.5.0"], ["slow", "pyjokes=0.6.0"]]:
+        environment = CondaEnvironment(packages=packages)
+        environment.apply_settings(test_settings)
+        slow_environments.append(environment)
+
+    popen_calls = []
+    original_popen = subprocess.Popen
+
+    def fake_popen(*args, **kwargs):
+        popen_calls.append(args)
+        if len(popen_calls) == 2:
+            raise KeyboardInterrupt
+        return original_popen(*args, **kwargs)
+
+    monkeypatch.setattr("subprocess.Popen", fake_popen)
+
+    start = time.monotonic()
+    with pytest.raises(KeyboardInterrupt):
+        CondaEnvironment.create_many(slow_environments)
+    assert time.monotonic() - start < 30
+    assert not any(environment.exists() for environment in slow_environments)
+
+
 def test_local_python_environment():
     """Since 'local' environment does not support installation of extra dependencies
     unlike virtualenv/conda, we can't use the generic test suite for it."""
@@ -340,6 +474,58 @@ def test_isolate_server_logs(isolate_server):
     assert "hello!!!" in [log.message for log in collected_logs]
 
 
+def test_isolate_server_key():
+    environment_1 = IsolateServer(
+        host="localhost:50001",
+        target_environment_kind="virtualenv",
+        target_environment_config={
+            "requirements": ["pyjokes"],
+            "extra": {"a": 1, "b": 2},
+        },
+    )
+    environment_2 = IsolateServer(
+        host="localhost:50001",
+        target_environment_kind="virtualenv",
+        target_environment_config={
+            "extra": {"b": 2, "a": 1},
+            "requirements": ["pyjokes"],
+        },
+    )
+    environment_3 = IsolateServer(
+        host="localhost:50001",
+        target_environment_kind="virtualenv",
+        target_environment_config={"requirements": ["pyjokes==0.5.0"]},
+    )
+    assert environment_1.key == environment_2.key != environment_3.key
+
+
+def test_isolate_server_shared_channel(isolate_server):
+    from isolate.backends.remote import _SHARED_CHANNELS
+
+    environment = IsolateServer(
+        host=isolate_server,
+        target_environment_kind="local",
+        target_environment_config={},
+    )
+
+    connection_key = environment.create()
+    with environment.open_connection(connection_key) as connection_1:
+        with environment.open_connection(connection_key) as connection_2:
+            assert connection_1._channel is connection_2._channel
+            assert connection_1.run(partial(eval, "1 + 1")) == 2
+            assert connection_2.run(partial(eval, "2 + 2")) == 4
+
+        assert isolate_server in _SHARED_CHANNELS
+
+    assert isolate_server not in _SHARED_CHANNELS
+
+    # Connections that are not entered only hold the channel during the call.
+    connection = environment.open_connection(connection_key)
+    assert connection.run(partial(eval, "3 + 3")) == 6
+    assert connection._channel is None
+    assert isolate_server not in _SHARED_CHANNELS
+
+
 def test_isolate_server_demo(isolate_server):
     from functools import partial
 
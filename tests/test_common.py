@@ -1,4 +1,10 @@
-from isolate.backends.common import replace_dir
+import os
+import time
+
+import pytest
+
+from isolate.backends import common
+from isolate.backends.common import get_executable_path, logged_io, replace_dir
 
 
 def test_replace_dir(tmp_path):
@@ -38,3 +44,50 @@ def test_replace_dir_with_existing_dst(tmp_path):
     assert dst_path.exists()
     assert (dst_path / "file").read_text() == "hello"
     assert (dst_path / "subdir" / "file").read_text() == "hello"
+
+
+def test_logged_io():
+    stdout_logs, stderr_logs = [], []
+    with logged_io(stdout_logs.append, stderr_logs.append) as (stdout, stderr):
+        os.write(stdout, b"first line\nsecond ")
+        os.write(stderr, b"error\n")
+        os.write(stdout, b"line\nunterminated line")
+
+    assert stdout_logs == ["first line", "second line", "unterminated line"]
+    assert stderr_logs == ["error"]
+
+
+def test_logged_io_slow_observer(monkeypatch):
+    monkeypatch.setattr(common, "_OBSERVER_TERMINATION_TIMEOUT", 0.1)
+
+    def slow_hook(line):
+        time.sleep(0.5)
+        logs.append(line)
+
+    # A slow log relay should neither fail the call nor mask its errors.
+    logs = []
+    with logged_io(slow_hook) as (stdout, _):
+        os.write(stdout, b"slow line\n")
+
+    with pytest.raises(ZeroDivisionError):
+        with logged_io(slow_hook) as (stdout, _):
+            os.write(stdout, b"slow line\n")
+            1 / 0
+
+
+def test_get_executable_path(tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+
+    executable = bin_dir / "python"
+    executable.write_text("#!/bin/sh\n")
+    executable.chmod(0o755)
+    assert get_executable_path(tmp_path, "python") == executable
+
+    with pytest.raises(FileNotFoundError):
+        get_executable_path(tmp_path, "pip")
+
+    # A directory is not an executable, even though it is 'accessible'.
+    (bin_dir / "pip").mkdir()
+    with pytest.raises(FileNotFoundError):
+        get_executable_path(tmp_path, "pip")
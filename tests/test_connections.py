@@ -1,4 +1,8 @@
+import importlib
+import multiprocessing
 import operator
+import os
+import pickle
 from dataclasses import replace
 from functools import partial
 from pathlib import Path
@@ -11,6 +15,8 @@ from isolate.backends.local import LocalPythonEnvironment
 from isolate.backends.settings import IsolateSettings
 from isolate.backends.virtualenv import VirtualPythonEnvironment
 from isolate.connections import LocalPythonGRPC, PythonIPC
+from isolate.connections.ipc import agent
+from isolate.connections.ipc._base import encode_service_address
 
 REPO_DIR = Path(__file__).parent.parent
 assert (
@@ -144,6 +150,94 @@ class TestPythonIPC(GenericPythonConnectionTests):
         return PythonIPC(environment, environment_path, **kwargs)
 
 
+@pytest.mark.parametrize(
+    "address",
+    [
+        ("localhost", 50001),
+        ("::1", 50001),
+        "/tmp/pymp-abc/listener-def",
+        "/tmp/non-utf8-\udcff/listener",
+    ],
+)
+def test_service_address_encoding(address: Any) -> None:
+    encoded_address = encode_service_address(address)
+    assert encoded_address.isascii()
+    assert "/" not in encoded_address and "+" not in encoded_address
+    assert agent.decode_service_address(encoded_address) == address
+
+
+class _OutOfBandBuffer:
+    """An object that exposes its data as an out-of-band pickle buffer."""
+
+    def __init__(self, data: bytearray) -> None:
+        self.data = data
+
+    def __reduce_ex__(self, protocol: int) -> Any:
+        if protocol >= 5:
+            return type(self), (pickle.PickleBuffer(self.data),)
+        return type(self), (self.data,)
+
+
+@pytest.mark.parametrize("serialization_method", ["pickle", "dill", "cloudpickle"])
+def test_serializing_connection_out_of_band(serialization_method: str) -> None:
+    serialization_backend = importlib.import_module(serialization_method)
+    left, right = multiprocessing.Pipe()
+    sender = agent.SerializingConnection(
+        left, serialization_backend, peer_protocol=pickle.HIGHEST_PROTOCOL
+    )
+    receiver = agent.SerializingConnection(
+        right, serialization_backend, peer_protocol=pickle.HIGHEST_PROTOCOL
+    )
+
+    sender.send((_OutOfBandBuffer(bytearray(b"x" * 1024)), "result"))
+    assert receiver.poll(1)
+
+    buffer, result = receiver.recv()
+    assert result == "result"
+    assert buffer.data == b"x" * 1024
+
+    # Buffers are received into writable memory.
+    memoryview(buffer.data)[0] = ord("y")
+    assert buffer.data[0] == ord("y")
+
+
+@pytest.mark.parametrize("serialization_method", ["pickle", "dill", "cloudpickle"])
+def test_serializing_connection_older_peer(serialization_method: str) -> None:
+    serialization_backend = importlib.import_module(serialization_method)
+    left, right = multiprocessing.Pipe()
+    # A peer running on Python 3.7 can't load anything above protocol 4.
+    sender = agent.SerializingConnection(left, serialization_backend, peer_protocol=4)
+
+    sender.send((_OutOfBandBuffer(bytearray(b"x" * 1024)), "result"))
+    assert right.poll(1)
+
+    # Everything is sent in a single message, without any out-of-band buffers.
+    message = right.recv_bytes()
+    assert message[:4] == b"\x00\x00\x00\x00"
+    assert message[4:6] == b"\x80\x04"
+    assert not right.poll(0.1)
+
+    buffer, result = pickle.loads(message[4:])
+    assert result == "result"
+    assert buffer.data == b"x" * 1024
+
+
+_PYTHON_37_PATH = (
+    Path(os.getenv("PYENV_ROOT", "~/.pyenv")).expanduser() / "versions" / "3.7.16"
+)
+
+
+@pytest.mark.skipif(
+    not (_PYTHON_37_PATH / "bin" / "python").exists(),
+    reason="Python 3.7 is not available.",
+)
+def test_ipc_agent_on_older_python() -> None:
+    local_env = LocalPythonEnvironment()
+    connection = PythonIPC(local_env, _PYTHON_37_PATH)
+    version = connection.run(partial(eval, "__import__('sys').version_info[:2]"))
+    assert version == (3, 7)
+
+
 class TestPythonGRPC(GenericPythonConnectionTests):
     def open_connection(
         self,
@@ -9,7 +9,11 @@ from isolate import prepare_environment
 def fresh_registry(monkeypatch):
     """Temporarily clear the environment registry for this test. Also restores
     back to the initial state once the test is executed."""
+    from isolate.registry import _scan_entry_points
+
     monkeypatch.setattr("isolate.registry._ENVIRONMENT_REGISTRY", {})
+    yield
+    _scan_entry_points.cache_clear()
 
 
 def test_unknown_environment(fresh_registry):